@@ -2,36 +2,96 @@
 
 """Biomappings resources."""
 
+import bisect
 import csv
+import hashlib
+import heapq
+import io
 import itertools as itt
 import os
-from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Sequence, Tuple
-
-from biomappings.utils import RESOURCE_PATH, get_canonical_tuple
+import shutil
+import sys
+import tempfile
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from biomappings.utils import RESOURCE_PATH
 
 MAPPINGS_HEADER = [
-    "source prefix",
-    "source identifier",
-    "source name",
-    "relation",
-    "target prefix",
-    "target identifier",
-    "target name",
-    "type",
-    "source",
+    sys.intern(key)
+    for key in [
+        "source prefix",
+        "source identifier",
+        "source name",
+        "relation",
+        "target prefix",
+        "target identifier",
+        "target name",
+        "type",
+        "source",
+    ]
 ]
 PREDICTIONS_HEADER = [
-    "source prefix",
-    "source identifier",
-    "source name",
-    "relation",
-    "target prefix",
-    "target identifier",
-    "target name",
-    "type",
-    "confidence",
-    "source",
+    sys.intern(key)
+    for key in [
+        "source prefix",
+        "source identifier",
+        "source name",
+        "relation",
+        "target prefix",
+        "target identifier",
+        "target name",
+        "type",
+        "confidence",
+        "source",
+    ]
+]
+#: The columns used by :func:`mapping_sort_key`
+SORT_HEADER = [
+    sys.intern(key)
+    for key in [
+        "source prefix",
+        "source identifier",
+        "relation",
+        "target prefix",
+        "target identifier",
+        "type",
+        "source",
+    ]
 ]
+#: The columns used by :func:`biomappings.utils.get_canonical_tuple`
+CANONICAL_HEADER = [
+    sys.intern(key)
+    for key in [
+        "source prefix",
+        "source identifier",
+        "target prefix",
+        "target identifier",
+    ]
+]
+
+_get_mapping_values = itemgetter(*MAPPINGS_HEADER)
+_get_prediction_values = itemgetter(*PREDICTIONS_HEADER)
+_get_prediction_canonical_values = itemgetter(
+    *(PREDICTIONS_HEADER.index(key) for key in CANONICAL_HEADER)
+)
+_MAPPINGS_KEYS = tuple(MAPPINGS_HEADER)
+_PREDICTIONS_KEYS = tuple(PREDICTIONS_HEADER)
 
 
 class MappingTuple(NamedTuple):
@@ -49,12 +109,12 @@ class MappingTuple(NamedTuple):
 
     def as_dict(self) -> Mapping[str, str]:
         """Get the mapping tuple as a dictionary."""
-        return dict(zip(MAPPINGS_HEADER, self))
+        return dict(zip(_MAPPINGS_KEYS, self))
 
     @classmethod
     def from_dict(cls, mapping: Mapping[str, str]) -> "MappingTuple":
         """Get the mapping tuple from a dictionary."""
-        return cls(*[mapping[key] for key in MAPPINGS_HEADER])
+        return cls(*_get_mapping_values(mapping))
 
     @property
     def source_curie(self) -> str:
@@ -83,12 +143,12 @@ class PredictionTuple(NamedTuple):
 
     def as_dict(self) -> Mapping[str, Any]:
         """Get the prediction tuple as a dictionary."""
-        return dict(zip(PREDICTIONS_HEADER, self))
+        return dict(zip(_PREDICTIONS_KEYS, self))
 
     @classmethod
     def from_dict(cls, mapping: Mapping[str, str]) -> "PredictionTuple":
         """Get the prediction tuple from a dictionary."""
-        return cls(*[mapping[key] for key in PREDICTIONS_HEADER])
+        return cls(*_get_prediction_values(mapping))
 
     @property
     def source_curie(self) -> str:
@@ -106,35 +166,273 @@ def get_resource_file_path(fname) -> str:
     return os.path.join(RESOURCE_PATH, fname)
 
 
-def _load_table(fname) -> List[Dict[str, str]]:
+#: A table stored column-wise, as a dictionary from each header to the column's values
+Columns = Dict[str, Tuple[str, ...]]
+
+#: Parsed tables, keyed by path, along with the modification time and size they were read at
+_TABLE_CACHE: Dict[str, Tuple[Tuple[int, int], Columns]] = {}
+#: Canonical hashes of each table, keyed by path, along with the modification time and size
+_CANONICAL_CACHE: Dict[str, Tuple[Tuple[int, int], FrozenSet[int]]] = {}
+
+
+def _get_stamp(fname) -> Tuple[int, int]:
+    stat = os.stat(fname)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _clear_cache(fname) -> None:
+    _TABLE_CACHE.pop(fname, None)
+    _CANONICAL_CACHE.pop(fname, None)
+
+
+def _read_table(fname) -> Columns:
+    stamp = _get_stamp(fname)
+    cached = _TABLE_CACHE.get(fname)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        columns = _read_columns_pyarrow(fname)
+    except ImportError:
+        columns = _read_columns(fname)
+    _TABLE_CACHE[fname] = stamp, columns
+    return columns
+
+
+def _read_columns(fname) -> Columns:
     with open(fname, "r") as fh:
         reader = csv.reader(fh, delimiter="\t")
-        header = next(reader)
-        return [dict(zip(header, row)) for row in reader]
+        # Interned keys let dictionary lookups with the header constants match by identity
+        header = [sys.intern(key) for key in next(reader)]
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError(
+                    f"{fname}:{reader.line_num} has {len(row)} fields, expected {len(header)}"
+                )
+            rows.append(row)
+    # The transpose would silently truncate every column to the shortest row,
+    # which is why the rows' lengths are checked above
+    if rows:
+        return dict(zip(header, zip(*rows)))
+    return {key: () for key in header}
+
+
+def _read_columns_pyarrow(fname) -> Columns:
+    """Read a table with :mod:`pyarrow`'s multithreaded CSV parser, if it's installed."""
+    import pyarrow
+    import pyarrow.csv
+
+    with open(fname, "r") as fh:
+        header = next(csv.reader(fh, delimiter="\t"))
+    try:
+        table = pyarrow.csv.read_csv(
+            fname,
+            # Blank lines are skipped by default, like in :func:`_read_columns`
+            parse_options=pyarrow.csv.ParseOptions(delimiter="\t", newlines_in_values=True),
+            # Keep all values as strings, like :func:`csv.reader` does
+            convert_options=pyarrow.csv.ConvertOptions(
+                column_types={key: pyarrow.string() for key in header},
+            ),
+        )
+    except pyarrow.ArrowInvalid as e:
+        # Rows with the wrong number of fields, which :func:`_read_columns` also rejects
+        raise ValueError(f"{fname}: {e}") from e
+    return {
+        sys.intern(key): tuple(column.to_pylist())
+        for key, column in zip(table.column_names, table.columns)
+    }
+
+
+def _iter_rows(
+    columns: Columns, header: Optional[Sequence[str]] = None
+) -> Iterable[Tuple[str, ...]]:
+    """Iterate over the rows of a column-wise table, optionally only over the given columns."""
+    return zip(*(columns[key] for key in (columns if header is None else header)))
+
+
+def _load_table(fname) -> List[Dict[str, str]]:
+    columns = _read_table(fname)
+    return [dict(zip(columns, row)) for row in _iter_rows(columns)]
+
+
+def _get_canonical_hash(
+    source_prefix: str, source_id: str, target_prefix: str, target_id: str
+) -> int:
+    """Get a 64-bit hash of a mapping's canonical tuple that is stable across processes."""
+    # The builtin hash() is salted per process, so it can't be used for the hashes
+    # that are stored in the index sidecar file
+    if source_prefix > target_prefix or (source_prefix == target_prefix and source_id > target_id):
+        source_prefix, source_id, target_prefix, target_id = (
+            target_prefix,
+            target_id,
+            source_prefix,
+            source_id,
+        )
+    key = f"{source_prefix}\t{source_id}\t{target_prefix}\t{target_id}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+
+def _load_canonical_hashes(fname) -> FrozenSet[int]:
+    """Get the canonical hashes from a table without building a dictionary for each row."""
+    stamp = _get_stamp(fname)
+    cached = _CANONICAL_CACHE.get(fname)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    columns = _read_table(fname)
+    rv = frozenset(_get_canonical_hash(*row) for row in _iter_rows(columns, CANONICAL_HEADER))
+    _CANONICAL_CACHE[fname] = stamp, rv
+    return rv
+
+
+def _union_canonical_hashes(fnames: Sequence[str]) -> Set[int]:
+    """Get the canonical hashes from several tables, reading them concurrently."""
+    with ThreadPoolExecutor(max_workers=len(fnames)) as executor:
+        return set().union(*executor.map(_load_canonical_hashes, fnames))
+
+
+@contextmanager
+def _open_atomic(path: str, mode: str = "w"):
+    """Open a temporary file that replaces the given path once it's been written successfully."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as file:
+            yield file
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 
 def _write_helper(
-    header: Sequence[str], lod: Iterable[Mapping[str, str]], path: str, mode: str
+    header: Sequence[str],
+    lod: Iterable[Mapping[str, str]],
+    path: str,
+    mode: str,
+    presorted: bool = False,
 ) -> None:
-    lod = sorted(lod, key=mapping_sort_key)
-    with open(path, mode) as file:
+    _write_helper_tuples(header, map(itemgetter(*header), lod), path, mode, presorted=presorted)
+
+
+def _write_helper_tuples(
+    header: Sequence[str],
+    tuples: Iterable[Sequence[str]],
+    path: str,
+    mode: str,
+    presorted: bool = False,
+) -> None:
+    """Write lines that are already tuples in header order, like :class:`MappingTuple`."""
+    if not presorted:
+        tuples = sorted(tuples, key=_get_sort_key(header))
+    with _open_atomic(path) if mode == "w" else open(path, mode) as file:
+        writer = csv.writer(file, delimiter="\t", lineterminator="\n")
         if mode == "w":
-            print(*header, sep="\t", file=file)
-        for line in lod:
-            print(*[line[k] for k in header], sep="\t", file=file)
+            writer.writerow(header)
+        writer.writerows(tuples)
+    _clear_cache(path)
+
+
+def _is_sorted(path: str) -> bool:
+    """Check if a table is sorted and has no redundant lines, stopping at the first that isn't."""
+    return _get_sorted_offsets(path) is not None
+
+
+def _get_sorted_offsets(path: str) -> Optional[List[int]]:
+    """Get the byte offsets where each line after the header starts, followed by the file's end.
+
+    :param path: The path to the table
+    :returns: The offsets, or None if the table isn't sorted, has redundant or blank lines,
+        or doesn't end with a newline
+    """
+    with open(path, "rb") as file:
+        line = file.readline()
+        header = next(csv.reader([line.decode("utf-8")], delimiter="\t"))
+        get_key = itemgetter(*(header.index(key) for key in SORT_HEADER))
+        offsets = [len(line)]
+        last_key, seen = None, set()
+        for row in csv.reader(_iter_decoded_lines(file, offsets), delimiter="\t"):
+            if not row:
+                # Blank lines get removed by rewriting the table
+                return None
+            key, row = get_key(row), tuple(row)
+            if last_key is not None and key < last_key:
+                return None
+            if key != last_key:
+                last_key, seen = key, set()
+            elif row in seen:
+                return None
+            seen.add(row)
+        file.seek(offsets[-1] - 1)
+        if file.read(1) != b"\n":
+            return None
+    return offsets
+
+
+def _iter_decoded_lines(file, offsets: List[int]) -> Iterable[str]:
+    """Decode the lines of a binary file, appending the offset where each one ends."""
+    for line in file:
+        offsets.append(offsets[-1] + len(line))
+        yield line.decode("utf-8")
+
+
+def _append_helper(
+    header: Sequence[str], tuples: Iterable[Sequence[str]], path: str, sort: bool
+) -> None:
+    if sort:
+        _merge_helper(header, tuples, path)
+    else:
+        _write_helper_tuples(header, tuples, path, "a")
+
+
+def _merge_helper(header: Sequence[str], tuples: Iterable[Sequence[str]], path: str) -> None:
+    """Merge new lines into a sorted table without redundant lines.
+
+    Only the part of the file from where the first new line belongs onwards is rewritten,
+    so new lines that sort after all of the existing ones are simply appended.
+
+    :param header: The table's header
+    :param tuples: The new lines, as tuples in the same order as the header
+    :param path: The path to the table
+    """
+    get_key = _get_sort_key(header)
+    new = sorted(tuples, key=get_key)
+    columns = _read_table(path)
+    existing = list(_iter_rows(columns, header))
+    offsets = _get_sorted_offsets(path)
+    # Lines with quoted newlines would make the offsets not line up with the rows
+    if list(columns) != list(header) or offsets is None or len(offsets) != len(existing) + 1:
+        merged = sorted(itt.chain(existing, new), key=get_key)
+        _write_helper_tuples(
+            header, _remove_redundant_sorted(merged, get_key), path, "w", presorted=True
+        )
+        return
+    if not new:
+        return
+    start = bisect.bisect_left([get_key(line) for line in existing], get_key(new[0]))
+    merged = heapq.merge(existing[start:], new, key=get_key)
+    with open(path, "r+b") as file:
+        file.seek(offsets[start])
+        file.truncate()
+        with io.TextIOWrapper(file, encoding="utf-8", newline="") as text_file:
+            writer = csv.writer(text_file, delimiter="\t", lineterminator="\n")
+            writer.writerows(_remove_redundant_sorted(merged, get_key))
+    _clear_cache(path)
 
 
 def mapping_sort_key(prediction: Mapping[str, str]) -> Tuple[str, ...]:
     """Return a tuple for sorting mapping dictionaries."""
-    return (
-        prediction["source prefix"],
-        prediction["source identifier"],
-        prediction["relation"],
-        prediction["target prefix"],
-        prediction["target identifier"],
-        prediction["type"],
-        prediction["source"],
-    )
+    return _mapping_sort_key(prediction)
+
+
+_mapping_sort_key = itemgetter(*SORT_HEADER)
+
+
+def _get_sort_key(header: Sequence[str]):
+    """Get the sort key for lines given as tuples in header order."""
+    return itemgetter(*(header.index(key) for key in SORT_HEADER))
 
 
 TRUE_MAPPINGS_PATH = get_resource_file_path("mappings.tsv")
@@ -147,14 +445,12 @@ def load_mappings() -> List[Dict[str, str]]:
 
 def append_true_mappings(m: Iterable[Mapping[str, str]], sort: bool = True) -> None:
     """Append new lines to the mappings table."""
-    _write_helper(MAPPINGS_HEADER, m, TRUE_MAPPINGS_PATH, "a")
-    if sort:
-        lint_true_mappings()
+    _append_helper(MAPPINGS_HEADER, map(_get_mapping_values, m), TRUE_MAPPINGS_PATH, sort)
 
 
 def append_true_mapping_tuples(mappings: Iterable[MappingTuple]) -> None:
     """Append new lines to the mappings table."""
-    append_true_mappings(mapping.as_dict() for mapping in set(mappings))
+    _append_helper(MAPPINGS_HEADER, set(mappings), TRUE_MAPPINGS_PATH, sort=True)
 
 
 def write_true_mappings(m: Iterable[Mapping[str, str]]) -> None:
@@ -164,9 +460,12 @@ def write_true_mappings(m: Iterable[Mapping[str, str]]) -> None:
 
 def lint_true_mappings() -> None:
     """Lint the true mappings file."""
+    if _is_sorted(TRUE_MAPPINGS_PATH):
+        return
     mappings = load_mappings()
     mappings = _remove_redundant(mappings, MappingTuple)
-    write_true_mappings(sorted(mappings, key=mapping_sort_key))
+    mappings = sorted(mappings, key=_mapping_sort_key)
+    _write_helper(MAPPINGS_HEADER, mappings, TRUE_MAPPINGS_PATH, "w", presorted=True)
 
 
 FALSE_MAPPINGS_PATH = get_resource_file_path("incorrect.tsv")
@@ -179,9 +478,7 @@ def load_false_mappings() -> List[Dict[str, str]]:
 
 def append_false_mappings(m: Iterable[Mapping[str, str]], sort: bool = True) -> None:
     """Append new lines to the false mappings table."""
-    _write_helper(MAPPINGS_HEADER, m, FALSE_MAPPINGS_PATH, "a")
-    if sort:
-        lint_false_mappings()
+    _append_helper(MAPPINGS_HEADER, map(_get_mapping_values, m), FALSE_MAPPINGS_PATH, sort)
 
 
 def write_false_mappings(m: Iterable[Mapping[str, str]]) -> None:
@@ -191,9 +488,12 @@ def write_false_mappings(m: Iterable[Mapping[str, str]]) -> None:
 
 def lint_false_mappings() -> None:
     """Lint the false mappings file."""
+    if _is_sorted(FALSE_MAPPINGS_PATH):
+        return
     mappings = load_false_mappings()
     mappings = _remove_redundant(mappings, MappingTuple)
-    write_false_mappings(sorted(mappings, key=mapping_sort_key))
+    mappings = sorted(mappings, key=_mapping_sort_key)
+    _write_helper(MAPPINGS_HEADER, mappings, FALSE_MAPPINGS_PATH, "w", presorted=True)
 
 
 UNSURE_PATH = get_resource_file_path("unsure.tsv")
@@ -206,9 +506,7 @@ def load_unsure() -> List[Dict[str, str]]:
 
 def append_unsure_mappings(m: Iterable[Mapping[str, str]], sort: bool = True) -> None:
     """Append new lines to the "unsure" mappings table."""
-    _write_helper(MAPPINGS_HEADER, m, UNSURE_PATH, "a")
-    if sort:
-        lint_unsure_mappings()
+    _append_helper(MAPPINGS_HEADER, map(_get_mapping_values, m), UNSURE_PATH, sort)
 
 
 def write_unsure_mappings(m: Iterable[Mapping[str, str]]) -> None:
@@ -218,9 +516,12 @@ def write_unsure_mappings(m: Iterable[Mapping[str, str]]) -> None:
 
 def lint_unsure_mappings() -> None:
     """Lint the unsure mappings file."""
+    if _is_sorted(UNSURE_PATH):
+        return
     mappings = load_unsure()
     mappings = _remove_redundant(mappings, MappingTuple)
-    write_unsure_mappings(sorted(mappings, key=mapping_sort_key))
+    mappings = sorted(mappings, key=_mapping_sort_key)
+    _write_helper(MAPPINGS_HEADER, mappings, UNSURE_PATH, "w", presorted=True)
 
 
 PREDICTIONS_PATH = get_resource_file_path("predictions.tsv")
@@ -236,39 +537,103 @@ def write_predictions(m: Iterable[Mapping[str, str]]) -> None:
     _write_helper(PREDICTIONS_HEADER, m, PREDICTIONS_PATH, "w")
 
 
+#: The tables whose mappings should not be appended to the predictions again
+INDEXED_PATHS = [TRUE_MAPPINGS_PATH, FALSE_MAPPINGS_PATH, UNSURE_PATH, PREDICTIONS_PATH]
+#: A sidecar file containing the canonical hashes of all indexed tables
+INDEX_PATH = get_resource_file_path(".canonical_hashes.bin")
+#: The start of the sidecar file, which is followed by the indexed tables' modification times
+#: and sizes as signed 64-bit integers then the canonical hashes as unsigned 64-bit integers
+_INDEX_MAGIC = b"biomappings canonical hashes v1\n"
+
+_INDEX_CACHE: Optional[Tuple[List[Tuple[int, int]], Set[int]]] = None
+
+
+def _get_canonical_index() -> Set[int]:
+    """Get the canonical hashes of all indexed tables, rebuilding the index if any is newer."""
+    global _INDEX_CACHE
+    stamps = [_get_stamp(path) for path in INDEXED_PATHS]
+    if _INDEX_CACHE is None:
+        _INDEX_CACHE = _read_canonical_index()
+    if _INDEX_CACHE is not None and _INDEX_CACHE[0] == stamps:
+        return _INDEX_CACHE[1]
+    index = _union_canonical_hashes(INDEXED_PATHS)
+    _write_canonical_index(index)
+    return index
+
+
+def _read_canonical_index() -> Optional[Tuple[List[Tuple[int, int]], Set[int]]]:
+    """Read the sidecar file, or return None if it's missing or malformed."""
+    try:
+        with open(INDEX_PATH, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    stamps, hashes = array("q"), array("Q")
+    stamps_end = len(_INDEX_MAGIC) + 2 * len(INDEXED_PATHS) * stamps.itemsize
+    if (
+        not data.startswith(_INDEX_MAGIC)
+        or len(data) < stamps_end
+        or (len(data) - stamps_end) % hashes.itemsize
+    ):
+        return None
+    stamps.frombytes(data[len(_INDEX_MAGIC) : stamps_end])
+    hashes.frombytes(data[stamps_end:])
+    return list(zip(stamps[::2], stamps[1::2])), set(hashes)
+
+
+def _write_canonical_index(index: Set[int]) -> None:
+    """Store the index against the current state of the indexed tables."""
+    global _INDEX_CACHE
+    stamps = [_get_stamp(path) for path in INDEXED_PATHS]
+    _INDEX_CACHE = stamps, index
+    with _open_atomic(INDEX_PATH, "wb") as file:
+        file.write(_INDEX_MAGIC)
+        file.write(array("q", itt.chain.from_iterable(stamps)).tobytes())
+        file.write(array("Q", index).tobytes())
+
+
 def append_prediction_tuples(
     prediction_tuples: Iterable[PredictionTuple], deduplicate: bool = True, sort: bool = True
 ) -> None:
     """Append new lines to the predictions table that come as canonical tuples."""
-    append_predictions(
-        (prediction_tuple.as_dict() for prediction_tuple in set(prediction_tuples)),
-        deduplicate=deduplicate,
-        sort=sort,
-    )
+    _append_prediction_tuples(set(prediction_tuples), deduplicate=deduplicate, sort=sort)
 
 
 def append_predictions(
     mappings: Iterable[Mapping[str, str]], deduplicate: bool = True, sort: bool = True
 ) -> None:
     """Append new lines to the predictions table."""
-    if deduplicate:
-        existing_mappings = {
-            get_canonical_tuple(existing_mapping)
-            for existing_mapping in itt.chain(
-                load_mappings(),
-                load_false_mappings(),
-                load_unsure(),
-                load_predictions(),
-            )
-        }
-        mappings = (
-            mapping for mapping in mappings if get_canonical_tuple(mapping) not in existing_mappings
-        )
+    _append_prediction_tuples(
+        map(_get_prediction_values, mappings), deduplicate=deduplicate, sort=sort
+    )
 
-    _write_helper(PREDICTIONS_HEADER, mappings, PREDICTIONS_PATH, "a")
+
+def _append_prediction_tuples(
+    tuples: Iterable[Sequence[Any]], deduplicate: bool, sort: bool
+) -> None:
+    if deduplicate:
+        existing_mappings = _get_canonical_index()
+        new_tuples, new_hashes = [], []
+        for prediction in tuples:
+            canonical_hash = _get_canonical_hash(*_get_prediction_canonical_values(prediction))
+            if canonical_hash not in existing_mappings:
+                new_tuples.append(prediction)
+                new_hashes.append(canonical_hash)
+        tuples = new_tuples
+
+    _write_helper_tuples(PREDICTIONS_HEADER, tuples, PREDICTIONS_PATH, "a")
+    if deduplicate:
+        existing_mappings.update(new_hashes)
+        del new_tuples, new_hashes
+    # Release the new lines before linting, which re-reads the whole table
+    del tuples
     if sort:
         lint_predictions()
 
+    if deduplicate:
+        # Linting only removes predictions that are already in the index, so it stays valid
+        _write_canonical_index(existing_mappings)
+
 
 def lint_predictions() -> None:
     """Lint the predictions file.
@@ -277,27 +642,55 @@ def lint_predictions() -> None:
     2. Make sure no rows in predictions match a row in the curated files
     3. Make sure it's sorted
     """
-    curated_mappings = {
-        get_canonical_tuple(mapping)
-        for mapping in itt.chain(
-            load_mappings(),
-            load_false_mappings(),
-            load_unsure(),
-        )
-    }
-    mappings = (
-        mapping
-        for mapping in load_predictions()
-        if get_canonical_tuple(mapping) not in curated_mappings
+    curated_mappings = _union_canonical_hashes(
+        [TRUE_MAPPINGS_PATH, FALSE_MAPPINGS_PATH, UNSURE_PATH]
+    )
+    if curated_mappings.isdisjoint(_load_canonical_hashes(PREDICTIONS_PATH)) and _is_sorted(
+        PREDICTIONS_PATH
+    ):
+        return
+    get_key = _get_sort_key(PREDICTIONS_HEADER)
+    predictions = sorted(
+        (
+            prediction
+            for prediction in _iter_rows(_read_table(PREDICTIONS_PATH), PREDICTIONS_HEADER)
+            if _get_canonical_hash(*_get_prediction_canonical_values(prediction))
+            not in curated_mappings
+        ),
+        key=get_key,
+    )
+    _write_helper_tuples(
+        PREDICTIONS_HEADER,
+        _remove_redundant_sorted(predictions, get_key),
+        PREDICTIONS_PATH,
+        "w",
+        presorted=True,
     )
-    mappings = _remove_redundant(mappings, PredictionTuple)
-    write_predictions(sorted(mappings, key=mapping_sort_key))
 
 
 def _remove_redundant(mappings, tuple_cls):
     return (mapping.as_dict() for mapping in {tuple_cls.from_dict(mapping) for mapping in mappings})
 
 
+def _remove_redundant_sorted(tuples, get_key):
+    """Remove redundant lines from a sorted iterable of tuples while keeping its order.
+
+    Redundant lines have the same sort key, so only the current run of equal keys is tracked.
+
+    :param tuples: The lines, sorted by ``get_key``
+    :param get_key: The function that gets the sort key of a line
+    :yields: The lines that aren't redundant with an earlier one
+    """
+    last_key, seen = None, set()
+    for line in tuples:
+        key = get_key(line)
+        if key != last_key:
+            last_key, seen = key, set()
+        if line not in seen:
+            seen.add(line)
+            yield line
+
+
 def load_curators():
     """Load the curators table."""
     return _load_table(get_resource_file_path("curators.tsv"))
@@ -309,17 +702,13 @@ def filter_predictions(custom_filter: Mapping[str, Mapping[str, Mapping[str, str
     :param custom_filter: A filter 3-dictionary of source prefix to target prefix
         to source identifier to target identifier
     """
-    predictions = load_predictions()
-    predictions = [
-        prediction for prediction in predictions if _check_filter(prediction, custom_filter)
-    ]
-    write_predictions(predictions)
-
-
-def _check_filter(
-    prediction: Mapping[str, str],
-    custom_filter: Mapping[str, Mapping[str, Mapping[str, str]]],
-) -> bool:
-    source_prefix, target_prefix = prediction["source prefix"], prediction["target prefix"]
-    source_id, target_id = prediction["source identifier"], prediction["target identifier"]
-    return target_id != custom_filter.get(source_prefix, {}).get(target_prefix, {}).get(source_id)
+    flat_filter = {
+        (source_prefix, source_id, target_prefix, target_id)
+        for source_prefix, target_filter in custom_filter.items()
+        for target_prefix, identifiers in target_filter.items()
+        for source_id, target_id in identifiers.items()
+    }
+    columns = _read_table(PREDICTIONS_PATH)
+    keep = [row not in flat_filter for row in _iter_rows(columns, CANONICAL_HEADER)]
+    rows = itt.compress(_iter_rows(columns, PREDICTIONS_HEADER), keep)
+    _write_helper_tuples(PREDICTIONS_HEADER, rows, PREDICTIONS_PATH, "w")
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for reading and writing the :mod:`biomappings` resource tables."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import biomappings.resources
+from biomappings.resources import (
+    FALSE_MAPPINGS_PATH,
+    MAPPINGS_HEADER,
+    MappingTuple,
+    PREDICTIONS_HEADER,
+    PREDICTIONS_PATH,
+    PredictionTuple,
+    TRUE_MAPPINGS_PATH,
+    UNSURE_PATH,
+    _is_sorted,
+    _merge_helper,
+    _read_columns,
+    _read_columns_pyarrow,
+    _read_table,
+    _write_helper_tuples,
+    append_predictions,
+    append_true_mappings,
+    filter_predictions,
+    lint_predictions,
+    lint_true_mappings,
+)
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def _mapping(source_id: str, target_id: str) -> MappingTuple:
+    return MappingTuple(
+        "chebi",
+        source_id,
+        f"name {source_id}",
+        "skos:exactMatch",
+        "mesh",
+        target_id,
+        f"name {target_id}",
+        "manually_reviewed",
+        "orcid:0000-0000-0000-0000",
+    )
+
+
+class TestRead(unittest.TestCase):
+    """Tests for reading tables."""
+
+    def setUp(self) -> None:
+        """Write a table to a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "mappings.tsv")
+        self.mappings = [_mapping("1", "D1"), _mapping("3", "D3"), _mapping("5", "D5")]
+        _write_helper_tuples(MAPPINGS_HEADER, self.mappings, self.path, "w")
+
+    def tearDown(self) -> None:
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def test_read_blank_line(self):
+        """Test blank lines are skipped instead of truncating the table."""
+        with open(self.path, "a") as file:
+            file.write("\n")
+        columns = _read_columns(self.path)
+        self.assertEqual(self.mappings, [MappingTuple(*row) for row in zip(*columns.values())])
+        self.assertFalse(_is_sorted(self.path))
+
+    def test_read_short_row(self):
+        """Test a row with missing fields raises an error instead of truncating the table."""
+        with open(self.path, "a") as file:
+            file.write("chebi\t7\n")
+        with self.assertRaises(ValueError):
+            _read_columns(self.path)
+
+    @unittest.skipUnless(pyarrow, "pyarrow is not installed")
+    def test_read_pyarrow(self):
+        """Test both readers give the same columns and reject the same malformed rows."""
+        for path in [TRUE_MAPPINGS_PATH, FALSE_MAPPINGS_PATH, UNSURE_PATH, PREDICTIONS_PATH]:
+            with self.subTest(path=os.path.basename(path)):
+                self.assertEqual(_read_columns(path), _read_columns_pyarrow(path))
+
+        with open(self.path, "a") as file:
+            file.write("\n")
+        self.assertEqual(_read_columns(self.path), _read_columns_pyarrow(self.path))
+
+        with open(self.path, "a") as file:
+            file.write("chebi\t7\n")
+        for read_columns in [_read_columns, _read_columns_pyarrow]:
+            with self.subTest(reader=read_columns.__name__), self.assertRaises(ValueError):
+                read_columns(self.path)
+
+
+class TestMerge(unittest.TestCase):
+    """Tests for merging new lines into a sorted table."""
+
+    def setUp(self) -> None:
+        """Write a sorted table to a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "mappings.tsv")
+        self.mappings = [_mapping("1", "D1"), _mapping("3", "D3"), _mapping("5", "D5")]
+        _write_helper_tuples(MAPPINGS_HEADER, self.mappings, self.path, "w")
+
+    def tearDown(self) -> None:
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def _read_mappings(self):
+        with open(self.path) as file:
+            return file.read()
+
+    def assert_table(self, mappings) -> None:
+        """Assert the table contains exactly the given mappings, in order."""
+        columns = _read_table(self.path)
+        self.assertEqual(MAPPINGS_HEADER, list(columns))
+        self.assertEqual(mappings, [MappingTuple(*row) for row in zip(*columns.values())])
+        self.assertTrue(_is_sorted(self.path))
+
+    def test_append_to_end(self):
+        """Test new lines that sort after all existing lines are appended."""
+        before = self._read_mappings()
+        _merge_helper(MAPPINGS_HEADER, [_mapping("7", "D7")], self.path)
+        self.assertTrue(self._read_mappings().startswith(before))
+        self.assert_table([*self.mappings, _mapping("7", "D7")])
+
+    def test_insert(self):
+        """Test new lines are inserted in order and redundant ones are dropped."""
+        new = [_mapping("4", "D4"), _mapping("2", "D2"), _mapping("3", "D3")]
+        _merge_helper(MAPPINGS_HEADER, new, self.path)
+        self.assert_table(
+            [
+                _mapping("1", "D1"),
+                _mapping("2", "D2"),
+                _mapping("3", "D3"),
+                _mapping("4", "D4"),
+                _mapping("5", "D5"),
+            ]
+        )
+
+    def test_insert_non_ascii(self):
+        """Test the tail is rewritten at the right place after lines with multi-byte characters."""
+        mappings = [self.mappings[0]._replace(source_name="β-alanine"), *self.mappings[1:]]
+        _write_helper_tuples(MAPPINGS_HEADER, mappings, self.path, "w")
+        _merge_helper(MAPPINGS_HEADER, [_mapping("4", "D4")], self.path)
+        self.assert_table([*mappings[:2], _mapping("4", "D4"), mappings[2]])
+
+    def test_unsorted(self):
+        """Test a table that isn't sorted is rewritten in full."""
+        _write_helper_tuples(MAPPINGS_HEADER, self.mappings[::-1], self.path, "w", presorted=True)
+        self.assertFalse(_is_sorted(self.path))
+        _merge_helper(MAPPINGS_HEADER, [_mapping("2", "D2")], self.path)
+        self.assert_table([self.mappings[0], _mapping("2", "D2"), *self.mappings[1:]])
+
+
+def _prediction(source_prefix, source_id, target_prefix, target_id) -> PredictionTuple:
+    return PredictionTuple(
+        source_prefix,
+        source_id,
+        f"name {source_id}",
+        "skos:exactMatch",
+        target_prefix,
+        target_id,
+        f"name {target_id}",
+        "lexical",
+        "0.9",
+        "test",
+    )
+
+
+class TemporaryResourcesTestCase(unittest.TestCase):
+    """A test case whose resource tables are in a temporary directory."""
+
+    def setUp(self) -> None:
+        """Redirect the resource tables and the index to a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        paths = {
+            name: os.path.join(self.directory.name, name)
+            for name in ["mappings.tsv", "incorrect.tsv", "unsure.tsv", "predictions.tsv"]
+        }
+        for name, path in paths.items():
+            header = PREDICTIONS_HEADER if name == "predictions.tsv" else MAPPINGS_HEADER
+            _write_helper_tuples(header, [], path, "w")
+        self.true_path = paths["mappings.tsv"]
+        self.predictions_path = paths["predictions.tsv"]
+        self.index_path = os.path.join(self.directory.name, ".canonical_hashes.bin")
+        patcher = mock.patch.multiple(
+            biomappings.resources,
+            TRUE_MAPPINGS_PATH=paths["mappings.tsv"],
+            FALSE_MAPPINGS_PATH=paths["incorrect.tsv"],
+            UNSURE_PATH=paths["unsure.tsv"],
+            PREDICTIONS_PATH=self.predictions_path,
+            INDEXED_PATHS=list(paths.values()),
+            INDEX_PATH=self.index_path,
+            _INDEX_CACHE=None,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def assert_predictions(self, predictions) -> None:
+        """Assert the predictions table contains exactly the given predictions."""
+        columns = _read_table(self.predictions_path)
+        self.assertEqual(predictions, [PredictionTuple(*row) for row in zip(*columns.values())])
+
+
+class TestFilter(TemporaryResourcesTestCase):
+    """Tests for filtering predictions."""
+
+    def test_filter(self):
+        """Test only the predictions that match the filter exactly are removed."""
+        kept = [
+            _prediction("chebi", "1", "mesh", "D2"),
+            _prediction("chebi", "2", "mesh", "D2"),
+            _prediction("mesh", "D1", "chebi", "1"),
+        ]
+        _write_helper_tuples(
+            PREDICTIONS_HEADER,
+            [_prediction("chebi", "1", "mesh", "D1"), *kept],
+            self.predictions_path,
+            "w",
+        )
+        filter_predictions({"chebi": {"mesh": {"1": "D1", "2": "D3"}}})
+        self.assert_predictions(kept)
+
+
+class TestLint(TemporaryResourcesTestCase):
+    """Tests for linting the resource tables."""
+
+    def _get_file_stamp(self, path):
+        # A rewritten table replaces the file, so it also gets a new inode
+        stat = os.stat(path)
+        return stat.st_ino, stat.st_mtime_ns
+
+    def test_sorted(self):
+        """Test tables that are already sorted aren't rewritten."""
+        _write_helper_tuples(
+            MAPPINGS_HEADER, [_mapping("1", "D1"), _mapping("2", "D2")], self.true_path, "w"
+        )
+        _write_helper_tuples(
+            PREDICTIONS_HEADER,
+            [_prediction("chebi", "3", "mesh", "D3")],
+            self.predictions_path,
+            "w",
+        )
+        for path, lint in [
+            (self.true_path, lint_true_mappings),
+            (self.predictions_path, lint_predictions),
+        ]:
+            with self.subTest(path=os.path.basename(path)):
+                before = self._get_file_stamp(path)
+                lint()
+                self.assertEqual(before, self._get_file_stamp(path))
+
+    def test_unsorted(self):
+        """Test a table that isn't sorted is rewritten."""
+        mappings = [_mapping("1", "D1"), _mapping("2", "D2")]
+        _write_helper_tuples(MAPPINGS_HEADER, mappings[::-1], self.true_path, "w", presorted=True)
+        lint_true_mappings()
+        self.assertTrue(_is_sorted(self.true_path))
+        columns = _read_table(self.true_path)
+        self.assertEqual(mappings, [MappingTuple(*row) for row in zip(*columns.values())])
+
+    def test_curated_prediction(self):
+        """Test a sorted predictions table is rewritten if it overlaps with a curated table."""
+        _write_helper_tuples(MAPPINGS_HEADER, [_mapping("1", "D1")], self.true_path, "w")
+        prediction = _prediction("chebi", "2", "mesh", "D2")
+        _write_helper_tuples(
+            PREDICTIONS_HEADER,
+            [_prediction("mesh", "D1", "chebi", "1"), prediction],
+            self.predictions_path,
+            "w",
+        )
+        self.assertTrue(_is_sorted(self.predictions_path))
+        lint_predictions()
+        self.assert_predictions([prediction])
+
+
+class TestIndex(TemporaryResourcesTestCase):
+    """Tests for deduplicating predictions with the canonical hash index."""
+
+    def test_sidecar(self):
+        """Test a reversed duplicate is dropped using the index loaded from the sidecar file."""
+        prediction = _prediction("chebi", "1", "mesh", "D1")
+        append_predictions([prediction.as_dict()])
+        self.assertTrue(os.path.exists(self.index_path))
+
+        # Forget the in-memory index, like a new process would
+        biomappings.resources._INDEX_CACHE = None
+        with mock.patch.object(
+            biomappings.resources,
+            "_union_canonical_hashes",
+            wraps=biomappings.resources._union_canonical_hashes,
+        ) as union:
+            append_predictions([_prediction("mesh", "D1", "chebi", "1").as_dict()])
+        # Linting still reads the curated tables, but the index isn't rebuilt
+        self.assertNotIn(mock.call(biomappings.resources.INDEXED_PATHS), union.call_args_list)
+        self.assert_predictions([prediction])
+
+    def test_malformed_sidecar(self):
+        """Test the index is rebuilt if the sidecar file is malformed."""
+        prediction = _prediction("chebi", "1", "mesh", "D1")
+        append_predictions([prediction.as_dict()])
+        with open(self.index_path, "rb") as file:
+            truncated = file.read()[:-1]
+        for data in [b"", b"not an index", truncated]:
+            with self.subTest(data=data[:20]):
+                with open(self.index_path, "wb") as file:
+                    file.write(data)
+                biomappings.resources._INDEX_CACHE = None
+                append_predictions([_prediction("mesh", "D1", "chebi", "1").as_dict()])
+                self.assert_predictions([prediction])
+
+    def test_rebuild(self):
+        """Test the index is rebuilt after a curated table changes."""
+        prediction = _prediction("chebi", "1", "mesh", "D1")
+        append_predictions([prediction.as_dict()])
+
+        append_true_mappings([_mapping("2", "D2").as_dict()])
+        # Without linting, only the index can drop the prediction of a curated mapping
+        append_predictions([_prediction("mesh", "D2", "chebi", "2").as_dict()], sort=False)
+        self.assert_predictions([prediction])